@@ -1,15 +1,21 @@
+import os
 import dash
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 from components.data_collection_preprocessing import data_collection_preprocessing_layout, register_data_collection_preprocessing_callbacks
 from components.training_section import training_layout, register_training_callbacks
 from components.reports_section import reports_layout, register_report_callbacks
+from components.cache import cache
 
 # Initialize the Dash app
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.SANDSTONE])
 app.title = "🍅 Kalimati Tomato Forecasting Dashboard"
 server = app.server  # Useful for deployment (e.g., Render, Heroku, etc.)
 
+# Filesystem cache so parsed CSVs are shared across callbacks and worker processes
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "dash")
+cache.init_app(server, config={"CACHE_TYPE": "FileSystemCache", "CACHE_DIR": CACHE_DIR})
+
 # App layout with combined upload and processing section
 app.layout = dbc.Container([
     html.H2("🍅 Kalimati Tomato Price Forecasting Dashboard", className="text-center mt-3 mb-4"),
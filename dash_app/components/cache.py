@@ -0,0 +1,9 @@
+"""
+cache.py
+--------
+Server-side cache shared by dashboard callbacks (bound to the Flask server in app.py).
+"""
+
+from flask_caching import Cache
+
+cache = Cache()
@@ -5,10 +5,30 @@ import dash_bootstrap_components as dbc
 import subprocess
 from datetime import datetime
 import os
-import base64
-import pandas as pd
+from components.utils import tail_csv
+
+# Optional SIMD-accelerated decoder (drop-in replacement for stdlib base64)
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
 
 UPLOAD_FOLDER = "data/raw"
+# Each Kalimati scraper can start SCRAPE_WORKERS headless Chromes, so they run one after another
+KALIMATI_SCRAPER_SCRIPTS = [
+    "src/scrapers/scraper_arrival.py",
+    "src/scrapers/scraper_price.py",
+]
+# Plain HTTP, no browser: safe to run alongside the Kalimati scrapers
+BACKGROUND_SCRAPER_SCRIPTS = ["src/scrapers/weather.py"]
+DECODE_CHUNK = 1 << 20  # base64 chars per slice (multiple of 4 keeps slices decodable)
+
+
+def save_base64_upload(content_string, save_path):
+    """Decode a base64 upload in fixed-size slices, writing each slice straight to disk."""
+    with open(save_path, "wb", buffering=1 << 20) as f:
+        for start in range(0, len(content_string), DECODE_CHUNK):
+            f.write(base64.b64decode(content_string[start:start + DECODE_CHUNK]))
 
 # Layout for combined Data Collection, Upload, and Preprocessing Section
 data_collection_preprocessing_layout = html.Div([
@@ -29,6 +49,7 @@ data_collection_preprocessing_layout = html.Div([
 
     # Display the last 5 rows of the latest data
     html.H6("🔍 Displaying last 5 rows of the latest data:"),
+    dcc.Store(id="latest-preview"),
     dash_table.DataTable(id="data-display-table", style_table={'height': '300px', 'overflowY': 'auto'})
 ])
 
@@ -36,7 +57,7 @@ def register_data_collection_preprocessing_callbacks(app):
     @app.callback(
         [Output("data-collection-status", "children"),
          Output("upload-status", "children"),
-         Output("data-display-table", "data")],
+         Output("latest-preview", "data")],
         [Input("upload-fuel", "contents"),
          Input("upload-inflation", "contents"),
          Input("upload-exchange", "contents"),
@@ -57,12 +78,10 @@ def register_data_collection_preprocessing_callbacks(app):
         if triggered in ["upload-fuel", "upload-inflation", "upload-exchange"]:
             for content, name in zip([fuel_content, inflation_content, exchange_content], [fuel_name, inf_name, exch_name]):
                 if content:
-                    content_type, content_string = content.split(",")
-                    decoded = base64.b64decode(content_string)
+                    content_type, content_string = content.split(",", 1)
                     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
                     save_path = os.path.join(UPLOAD_FOLDER, name)
-                    with open(save_path, "wb") as f:
-                        f.write(decoded)
+                    save_base64_upload(content_string, save_path)
                     uploaded.append(name)
 
             upload_status = f"✅ Updated files: {', '.join(uploaded)}"
@@ -71,9 +90,17 @@ def register_data_collection_preprocessing_callbacks(app):
         # Handle data collection (scraping)
         elif triggered == "btn-scrape-data":
             try:
-                subprocess.run(["python", "src/scrapers/scraper_arrival.py"], check=True)
-                subprocess.run(["python", "src/scrapers/scraper_price.py"], check=True)
-                subprocess.run(["python", "src/scrapers/weather.py"], check=True)
+                # Weather runs in the background while the Kalimati scrapers take turns
+                background = [subprocess.Popen(["python", script]) for script in BACKGROUND_SCRAPER_SCRIPTS]
+                try:
+                    for script in KALIMATI_SCRAPER_SCRIPTS:
+                        subprocess.run(["python", script], check=True)
+                finally:
+                    for proc in background:
+                        proc.wait()
+                for proc in background:
+                    if proc.returncode != 0:
+                        raise subprocess.CalledProcessError(proc.returncode, proc.args)
 
                 # Check if the raw data files exist and load them
                 data_files = {
@@ -85,7 +112,7 @@ def register_data_collection_preprocessing_callbacks(app):
                 # Collect the first 4 columns and the last 5 rows of each dataset
                 for file_name, file_path in data_files.items():
                     if os.path.exists(file_path):
-                        df = pd.read_csv(file_path).iloc[:, :4].tail(5)  # Select first 4 columns and last 5 rows
+                        df = tail_csv(file_path, n=5, ncols=4)  # First 4 columns of the last 5 rows
                         df_display.extend(df.to_dict('records'))  # Flatten the data into a single list
 
                 # Return the data display and success message
@@ -101,10 +128,17 @@ def register_data_collection_preprocessing_callbacks(app):
                 subprocess.run(["python", "src/preprocessing/feature_engineering.py"], check=True)
 
                 # Load the processed dataset (for displaying)
-                df_display = pd.read_csv('data/processed/tomato_clean_data.csv').iloc[:, :4].tail(5).to_dict('records')  # Adjust path as needed
+                df_display = tail_csv('data/processed/tomato_clean_data.csv', n=5, ncols=4).to_dict('records')  # Adjust path as needed
                 return dash.no_update, dash.no_update, df_display
 
             except subprocess.CalledProcessError as e:
                 return f"❌ Error during data preprocessing: {e}", dash.no_update, dash.no_update
 
         return dash.no_update, dash.no_update, dash.no_update
+
+    # The table just mirrors the stored preview, so render it in the browser
+    app.clientside_callback(
+        "function(data) { return data || []; }",
+        Output("data-display-table", "data"),
+        Input("latest-preview", "data")
+    )
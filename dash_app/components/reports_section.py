@@ -2,6 +2,24 @@ from dash import html, dcc, Output, Input
 import dash_bootstrap_components as dbc
 import pandas as pd
 import os
+from components.cache import cache
+
+REGISTRY_PATH = "outputs/results/model_registry.csv"
+
+
+# =========================================================
+# 🗂️ Cached Registry Access (keyed on file mtime)
+# =========================================================
+@cache.memoize(timeout=300)
+def _load_registry(path, mtime):
+    """Parse the registry CSV once per (path, mtime); callers must not mutate the result."""
+    return pd.read_csv(path)
+
+
+def _model_subset(path, mtime, selected_model):
+    """Registry rows for a single model (a fresh frame; the memoized registry is not exposed)."""
+    df = _load_registry(path, mtime)
+    return df[df["Model"] == selected_model].copy()
 
 # =========================================================
 # 📊 Layout for Reports Section
@@ -30,10 +48,10 @@ def register_report_callbacks(app):
     )
     def load_model_list(_):
         """Load available models from registry CSV."""
-        registry_path = "outputs/results/model_registry.csv"
+        registry_path = REGISTRY_PATH
         if not os.path.exists(registry_path):
             return [], None
-        df = pd.read_csv(registry_path)
+        df = _load_registry(registry_path, os.path.getmtime(registry_path))
         models = df["Model"].unique().tolist()
         return [{"label": m, "value": m} for m in models], (models[-1] if models else None)
 
@@ -45,13 +63,12 @@ def register_report_callbacks(app):
     def update_report(selected_model):
         """Display model metrics + simple chart."""
         import plotly.express as px
-        registry_path = "outputs/results/model_registry.csv"
+        registry_path = REGISTRY_PATH
 
         if not os.path.exists(registry_path) or not selected_model:
             return html.P("No models found or selected."), {}
 
-        df = pd.read_csv(registry_path)
-        df_model = df[df["Model"] == selected_model]
+        df_model = _model_subset(registry_path, os.path.getmtime(registry_path), selected_model)
 
         metrics = html.Ul([
             html.Li(f"Latest MAE: {df_model['MAE'].iloc[-1]}"),
@@ -2,41 +2,86 @@ import dash
 from dash import html, Output, Input, ctx, dcc
 import dash_bootstrap_components as dbc
 import subprocess
+from collections import deque
 from datetime import datetime
 import os
 
-# Update the layout to include a loading spinner around the output area
+LOG_DIR = "logs"
+
+# Background jobs launched from the dashboard: name -> (process, log file handle, log path, label)
+_jobs = {}
+
+JOB_SCRIPTS = {
+    "btn-tune": ("tune", "Hyperparameter tuning", "src/modeling/hyperparameter_tuning.py"),
+    "btn-train": ("train", "Model training", "src/modeling/model_pipeline.py"),
+}
+
+# The output area is refreshed by a poll interval while a job runs in the background
 training_layout = html.Div([
     html.H5("⚙️ Model Operations"),
-    
+
     # Removed the "Run Full Pipeline" button
     dbc.Button("🔍 Run Hyperparameter Tuning", id="btn-tune", color="warning", className="mb-2 me-2"),
     dbc.Button("🏋️ Train Models", id="btn-train", color="primary", className="mb-2"),
-    
-    # Wrapping the output area with dcc.Loading for loading indicator
-    dcc.Loading(
-        id="loading",
-        type="circle",  # You can choose between 'circle', 'dot', 'default', etc.
-        children=html.Div(id="train-status", className="mt-3 text-info")
-    )
+
+    html.Div(id="train-status", className="mt-3 text-info"),
+    dcc.Interval(id="train-poll", interval=2000, disabled=True)
 ])
 
+
+def _tail_log(path, n=5):
+    """Return the last `n` lines of a job log."""
+    if not os.path.exists(path):
+        return ""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return "".join(deque(f, maxlen=n))
+
+
+def _running_job():
+    """Return the name of the job still running, if any."""
+    for name, (proc, _, _, _) in _jobs.items():
+        if proc.poll() is None:
+            return name
+    return None
+
+
 def register_training_callbacks(app):
     @app.callback(
         Output("train-status", "children"),
+        Output("train-poll", "disabled"),
         Input("btn-tune", "n_clicks"),
         Input("btn-train", "n_clicks"),
+        Input("train-poll", "n_intervals"),
         prevent_initial_call=True
     )
-    def run_operations(btn_tune, btn_train):
+    def run_operations(btn_tune, btn_train, n_intervals):
         triggered = ctx.triggered_id
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        # Removed full pipeline logic
-        if triggered == "btn-tune":
-            subprocess.run(["python", "src/modeling/hyperparameter_tuning.py"])
-            return f"✅ Hyperparameter tuning completed at {timestamp}"
+        # Launch the script without blocking this worker; progress is polled below
+        if triggered in JOB_SCRIPTS:
+            running = _running_job()
+            if running:
+                return f"⏳ {running} job is still running — wait for it to finish.", False
+
+            name, label, script = JOB_SCRIPTS[triggered]
+            os.makedirs(LOG_DIR, exist_ok=True)
+            log_path = os.path.join(LOG_DIR, f"{name}.log")
+            log_file = open(log_path, "w", encoding="utf-8")
+            proc = subprocess.Popen(["python", script], stdout=log_file, stderr=subprocess.STDOUT)
+            _jobs[name] = (proc, log_file, log_path, label)
+            return f"🚀 {label} started at {timestamp}", False
+
+        # Poll tick: report progress of the active job, stop polling once it exits
+        for name, (proc, log_file, log_path, label) in list(_jobs.items()):
+            rc = proc.poll()
+            if rc is None:
+                return html.Pre(f"⏳ {label} running...\n{_tail_log(log_path)}"), False
+
+            log_file.close()
+            del _jobs[name]
+            if rc == 0:
+                return f"✅ {label} completed at {timestamp}", True
+            return html.Pre(f"❌ {label} failed (exit code {rc})\n{_tail_log(log_path)}"), True
 
-        elif triggered == "btn-train":
-            subprocess.run(["python", "src/modeling/model_pipeline.py"])
-            return f"✅ Model training completed at {timestamp}"
+        return dash.no_update, True
@@ -0,0 +1,24 @@
+"""
+utils.py
+--------
+Small helpers shared by the dashboard components.
+"""
+
+import io
+from collections import deque
+
+import pandas as pd
+
+
+# ============================================================
+# 📄 Read only the tail of a CSV
+# ============================================================
+def tail_csv(path, n=5, ncols=4):
+    """Return the last `n` rows (first `ncols` columns) without parsing the whole file."""
+    with open(path, "rb") as f:
+        header = f.readline()
+        last = deque(f, maxlen=n)
+    if last and not last[-1].endswith(b"\n"):
+        last[-1] += b"\n"
+    buf = io.BytesIO(header + b"".join(last))
+    return pd.read_csv(buf, usecols=range(ncols))
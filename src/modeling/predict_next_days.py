@@ -6,20 +6,30 @@ import pandas as pd
 import numpy as np
 import joblib
 import os
+import sys
+import hashlib
+import warnings
 import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 
+# One lag/rolling implementation (Numba kernel + pandas fallback) shared with preprocessing
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "preprocessing"))
+from feature_engineering import lag_and_rolling_columns
+
 # =========================================================
 # 🧩 Load Data and Model
 # =========================================================
 def load_latest_data(path="data/tomato_clean_data.csv"):
     if not os.path.exists(path):
         raise FileNotFoundError(f"❌ Dataset not found: {path}")
-    df = pd.read_csv(path)
-    df["Date"] = pd.to_datetime(df["Date"])
-    df = df.sort_values("Date").reset_index(drop=True)
+    try:
+        # Multithreaded Arrow parser; dates are parsed during the read
+        df = pd.read_csv(path, engine="pyarrow", parse_dates=["Date"])
+    except ImportError:
+        df = pd.read_csv(path, parse_dates=["Date"])
+    df = df.sort_values("Date", ignore_index=True)
     print(f"📊 Loaded {len(df)} daily records from {df['Date'].min().date()} → {df['Date'].max().date()}")
     return df
 
@@ -27,65 +37,161 @@ def load_model(model_path="results/tomato_price_model.pkl"):
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"❌ Model not found: {model_path}")
     print(f"✅ Loaded trained model → {model_path}")
-    return joblib.load(model_path)
+    # Memory-map the tree arrays so pages load on demand (only works for uncompressed dumps)
+    return joblib.load(model_path, mmap_mode="r")
 
 # =========================================================
 # 🧮 Lag and Rolling Features
 # =========================================================
-def add_lag_and_rolling_features(df, lag_features, lags=[1,3,7], rolls=[7,30]):
-    df = df.copy()
+FEATURE_CACHE_DIR = os.path.join(".cache", "features")
+
+
+def add_lag_and_rolling_features(df, lag_features, lags=[1,3,7], rolls=[7,30], use_cache=False):
+    if not use_cache:
+        return _compute_lag_and_rolling_features(df, lag_features, lags, rolls)
+
+    # Key on the frame contents and the feature spec; unchanged input reuses the stored result
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df).to_numpy().tobytes())
+    digest.update(repr((list(df.columns), list(lag_features), list(lags), list(rolls))).encode())
+    cache_path = os.path.join(FEATURE_CACHE_DIR, f"feat_{digest.hexdigest()[:12]}.parquet")
+    try:
+        if os.path.exists(cache_path):
+            print(f"♻️ Reusing cached lag/rolling features → {cache_path}")
+            return pd.read_parquet(cache_path)
+        out = _compute_lag_and_rolling_features(df, lag_features, lags, rolls)
+        os.makedirs(FEATURE_CACHE_DIR, exist_ok=True)
+        out.to_parquet(cache_path)
+        return out
+    except ImportError:
+        print("⚠️ pyarrow not installed — computing features without cache.")
+        return _compute_lag_and_rolling_features(df, lag_features, lags, rolls)
+
+
+def _compute_lag_and_rolling_features(df, lag_features, lags, rolls):
+    # Lags index the observed values; rolling means cover the previous `roll` days (shift(1).rolling)
+    lag_cols, roll_cols = {}, {}
+    prev = df[lag_features].shift(1)
     for feature in lag_features:
-        for lag in lags:
-            df[f"{feature}_lag{lag}"] = df[feature].shift(lag)
-        for roll in rolls:
-            df[f"{feature}_rollmean_{roll}"] = df[feature].shift(1).rolling(window=roll).mean()
-    return df
+        lag_and_rolling_columns(df, feature, lags, [], lag_cols)
+        lag_and_rolling_columns(prev, feature, [], rolls, roll_cols)
+
+    # Each feature's lags and rolls stay adjacent
+    new_cols = {}
+    for feature in lag_features:
+        new_cols.update((f"{feature}_lag{lag}", lag_cols[f"{feature}_lag{lag}"]) for lag in lags)
+        new_cols.update((f"{feature}_rollmean_{roll}", roll_cols[f"{feature}_roll{roll}"]) for roll in rolls)
+    new_df = pd.DataFrame(new_cols, index=df.index)
+    # Drop stale copies first so recomputation replaces them instead of duplicating columns
+    base = df.drop(columns=list(new_cols), errors="ignore")
+    return pd.concat([base, new_df], axis=1)
 
 # =========================================================
 # 🔮 Recursive Forecast Function
 # =========================================================
-def forecast_next_days(df, model, lag_features, start_date=None, end_date=None):
-    df = df.copy()
-    df = add_lag_and_rolling_features(df, lag_features)
-    df = df.dropna().reset_index(drop=True)
+def forecast_next_days(df, model, lag_features, start_date=None, end_date=None, lags=[1,3,7], rolls=[7,30],
+                       scenarios=None, use_cache=False):
+    """Recursive forecast; `scenarios` is an optional list of {feature: value} exogenous overrides
+    (e.g. rainfall paths) that are all predicted in one batched `model.predict` call per day."""
+    window = max(max(lags), max(rolls))
+    if len(df) < window:
+        raise ValueError(f"❌ Need at least {window} days of history to forecast, got {len(df)}")
+    raw = df[lag_features].to_numpy(dtype=np.float64)
+
+    df = df.reset_index(drop=True)
+    df = add_lag_and_rolling_features(df, lag_features, lags, rolls, use_cache=use_cache)
+    df = df.dropna()
+    if df.empty:
+        raise ValueError(f"❌ No complete rows left after building lag/rolling features (need more than {window} days)")
+
+    # Seed from the raw observed values the lags/rolls index into, ending at the last complete row;
+    # dropna has already trimmed the head of the frame, so it can't supply a full window
+    last_pos = df.index[-1]
+    seed = raw[last_pos + 1 - window:last_pos + 1]
+    df = df.reset_index(drop=True)
 
     trained_features = list(model.feature_names_in_)
-    last_known = df.iloc[-1:].copy()
+    last_known = df.iloc[-1].to_dict()
     forecast_results = []
 
     # Determine forecast horizon
-    last_date = last_known["Date"].iloc[-1]
+    last_date = last_known["Date"]
     if start_date is None:
         start_date = last_date + timedelta(days=1)
     if end_date is None:
         end_date = start_date + timedelta(days=7)
 
     forecast_days = (end_date - start_date).days + 1
+    # The recursion steps forward from the last observed day, one calendar day per prediction
+    dates = pd.date_range(last_date + timedelta(days=1), periods=forecast_days, freq="D")
     print(f"📅 Forecasting from {start_date.date()} → {end_date.date()} ({forecast_days} days)")
 
-    # Step through forecast range
-    for i in range(forecast_days):
-        next_date = last_known["Date"].iloc[-1] + timedelta(days=1)
-
-        df_extended = pd.concat([df, last_known], ignore_index=True)
-        df_extended = add_lag_and_rolling_features(df_extended, lag_features)
-        new_row = df_extended.iloc[-1:].copy()
-
-        X_pred = new_row.drop(columns=["Average_Price", "Date"], errors="ignore")
-
-        # Align feature columns with training
-        for col in trained_features:
-            if col not in X_pred.columns:
-                X_pred[col] = 0
-        X_pred = X_pred[trained_features]
-
-        pred_price = model.predict(X_pred)[0]
-
-        new_row["Date"] = next_date
-        new_row["Average_Price"] = pred_price
-        forecast_results.append({"Date": next_date, "Predicted_Price": pred_price})
+    # One row per scenario; the default is a single baseline path with no overrides
+    batch = scenarios or [{}]
+    feature_idx = {f: k for k, f in enumerate(lag_features)}
+    carried = [(s, feature_idx[f], v) for s, overrides in enumerate(batch) for f, v in overrides.items() if f in feature_idx]
+
+    # Preallocated history per scenario: last max(lags, rolls) observed rows + one slot per forecast day
+    history = np.empty((len(batch), window + forecast_days, len(lag_features)))
+    history[:, :window] = seed
+    price_idx = feature_idx["Average_Price"]
+
+    # Model input buffer aligned with training columns (unseen features default to 0);
+    # static columns are filled once, lag/rolling columns are rewritten in place each day
+    col_idx = {name: j for j, name in enumerate(trained_features)}
+    X_buf = np.array(
+        [[{**last_known, **overrides}.get(col, 0) for col in trained_features] for overrides in batch],
+        dtype=np.float32,
+    )
 
-        last_known = pd.concat([last_known, new_row]).iloc[-1:]
+    def _positions(names):
+        """(history feature index, buffer column) pairs for the names the model was trained on."""
+        pairs = [(k, col_idx[n]) for k, n in enumerate(names) if n in col_idx]
+        return np.array([k for k, _ in pairs], dtype=np.intp), np.array([j for _, j in pairs], dtype=np.intp)
+
+    lag_pos = {lag: _positions([f"{f}_lag{lag}" for f in lag_features]) for lag in lags}
+    roll_pos = {roll: _positions([f"{f}_rollmean_{roll}" for f in lag_features]) for roll in rolls}
+    price_col = col_idx.get("Average_Price")
+
+    # Single-row predicts are dominated by joblib thread start-up, so predict serially.
+    # Saved models are Pipelines; n_jobs lives on the final estimator.
+    est = model[-1] if hasattr(model, "steps") else model
+    estimator_jobs = getattr(est, "n_jobs", None)
+    if estimator_jobs not in (None, 1):
+        est.n_jobs = 1
+
+    try:
+        # The buffer carries no column names; it is already in feature_names_in_ order
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="X does not have valid feature names", category=UserWarning)
+
+            # Step through forecast range, updating lags/rolling means in O(1) per day
+            for i in range(forecast_days):
+                next_date = dates[i]
+                pos = window + i  # slot the new day will occupy
+
+                for lag, (src, dst) in lag_pos.items():
+                    X_buf[:, dst] = history[:, pos - lag, src]
+                for roll, (src, dst) in roll_pos.items():
+                    X_buf[:, dst] = history[:, pos - roll:pos, src].mean(axis=1)
+
+                pred_prices = model.predict(X_buf)
+
+                for s, pred_price in enumerate(pred_prices):
+                    result = {"Date": next_date, "Predicted_Price": pred_price}
+                    if scenarios:
+                        result["Scenario"] = s
+                    forecast_results.append(result)
+
+                # Feed predictions back; exogenous inputs are carried forward (or held at their override)
+                history[:, pos] = history[:, pos - 1]
+                history[:, pos, price_idx] = pred_prices
+                for s, k, value in carried:
+                    history[s, pos, k] = value
+                if price_col is not None:
+                    X_buf[:, price_col] = pred_prices
+    finally:
+        if estimator_jobs not in (None, 1):
+            est.n_jobs = estimator_jobs
 
     return pd.DataFrame(forecast_results)
 
@@ -129,7 +235,7 @@ if __name__ == "__main__":
     end_date = datetime(2025, 11, 17)
 
     print("\n🔮 Generating forecast for custom period...")
-    forecast_df = forecast_next_days(df, model, lag_features, start_date=start_date, end_date=end_date)
+    forecast_df = forecast_next_days(df, model, lag_features, start_date=start_date, end_date=end_date, use_cache=True)
 
     # Save outputs
     forecast_df.to_csv("results/custom_forecast_2025_11_10_to_17.csv", index=False)
@@ -0,0 +1,172 @@
+"""
+training.py
+-----------
+Candidate models, fitting and the train/save/register loop shared by model_pipeline.py and hyperparameter_tuning.py.
+"""
+
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from datetime import date
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.preprocessing import StandardScaler
+from sklearn.pipeline import Pipeline
+
+# Optional (ensure xgboost installed)
+try:
+    from xgboost import XGBRegressor
+except ImportError:
+    XGBRegressor = None
+
+
+# ============================================================
+# 🗜️ Compact Numeric Dtypes
+# ============================================================
+def downcast_to_32bit(df):
+    """Store float64 columns as float32 and int64 columns as int32."""
+    float_cols = df.select_dtypes(include="float64").columns
+    df[float_cols] = df[float_cols].astype("float32")
+    int_cols = df.select_dtypes(include="int64").columns
+    df[int_cols] = df[int_cols].astype("int32")
+    return df
+
+
+# ============================================================
+# ⚙️ Train + Evaluate a Single Model
+# ============================================================
+def _tree_models():
+    """Model classes that are invariant to feature scaling."""
+    trees = (RandomForestRegressor, GradientBoostingRegressor)
+    return trees + (XGBRegressor,) if XGBRegressor else trees
+
+
+def train_and_evaluate_model(model_name, model, X_train, X_test, y_train, y_test):
+    """Train a single model and return its performance metrics."""
+    # Tree ensembles split on thresholds, so scaling their inputs is wasted work
+    steps = [("model", model)]
+    if not isinstance(model, _tree_models()):
+        steps.insert(0, ("scaler", StandardScaler()))
+    pipeline = Pipeline(steps)
+    pipeline.fit(X_train, y_train)
+    y_pred = pipeline.predict(X_test)
+
+    mae = mean_absolute_error(y_test, y_pred)
+    r2 = r2_score(y_test, y_pred)
+    print(f"✅ {model_name}: MAE={mae:.3f}, R²={r2:.3f}")
+    return pipeline, mae, r2, y_pred
+
+
+# ============================================================
+# 🧩 Candidate Models
+# ============================================================
+def candidate_models(n_jobs=-1):
+    """Return the models to train, keyed by name; `n_jobs` goes to the multi-threaded ones."""
+    models = {
+        "random_forest": RandomForestRegressor(
+            n_estimators=200, max_depth=20, random_state=42, n_jobs=n_jobs
+        ),
+        "gradient_boost": GradientBoostingRegressor(
+            n_estimators=200, learning_rate=0.1, max_depth=5, random_state=42
+        )
+    }
+
+    if XGBRegressor:
+        models["xgboost"] = XGBRegressor(
+            n_estimators=300, learning_rate=0.05, max_depth=8, random_state=42, n_jobs=n_jobs,
+            tree_method="hist"
+        )
+    return models
+
+
+def fit_candidate_models(X_train, X_test, y_train, y_test):
+    """Fit every candidate model; return [(name, (pipeline, mae, r2, y_pred)), ...] in a fixed order."""
+    cpus = os.cpu_count() or 1
+    models = candidate_models()
+    print(f"\n🚀 Training {', '.join(models)} models...")
+
+    # Too few cores to run the fits side by side: train one after another, each using every core
+    if cpus < len(models):
+        return [
+            (name, train_and_evaluate_model(name, model, X_train, X_test, y_train, y_test))
+            for name, model in models.items()
+        ]
+
+    # Independent fits: run them in separate processes and split the cores between them
+    models = candidate_models(n_jobs=cpus // len(models))
+    fitted = Parallel(n_jobs=len(models), backend="loky")(
+        delayed(train_and_evaluate_model)(name, model, X_train, X_test, y_train, y_test)
+        for name, model in models.items()
+    )
+    # The reduced thread count only applied to the side-by-side fit; saved models use every core
+    for pipeline, *_ in fitted:
+        if hasattr(pipeline[-1], "n_jobs"):
+            pipeline[-1].n_jobs = -1
+    return list(zip(models, fitted))
+
+
+# ============================================================
+# 🏋️ Train, Save and Register All Candidates
+# ============================================================
+def train_all_models(df, target="Average_Price"):
+    """Train every candidate model, save models and predictions, and return the full registry."""
+    if target not in df.columns:
+        raise ValueError(f"❌ Target column '{target}' not found in dataset.")
+
+    # Trees split in float32 anyway; cast once into a single block before splitting
+    X = df.drop(columns=[target, "Date"], errors="ignore").astype(np.float32)
+    y = df[target].to_numpy()
+
+    # Chronological split (80/20): row slices of one block are views, not copies.
+    # X stays a DataFrame so the saved pipelines keep feature_names_in_ for forecasting.
+    train_size = int(len(df) * 0.8)
+    X_train, X_test = X.iloc[:train_size], X.iloc[train_size:]
+    y_train, y_test = y[:train_size], y[train_size:]
+
+    print(f"📊 Training samples: {len(X_train)}, Testing samples: {len(X_test)}")
+
+    today = date.today().isoformat()
+    os.makedirs("outputs/models", exist_ok=True)
+    os.makedirs("outputs/results", exist_ok=True)
+
+    results = []
+
+    for name, (trained_model, mae, r2, y_pred) in fit_candidate_models(X_train, X_test, y_train, y_test):
+        # Uncompressed dump: joblib.load(..., mmap_mode="r") can memory-map it if loaded later
+        model_path = f"outputs/models/{name}_{today}.joblib"
+        joblib.dump(trained_model, model_path)
+
+        # Save predictions
+        pred_path = f"outputs/results/predictions_{name}_{today}.csv"
+        pd.DataFrame({
+            "Date": df["Date"].iloc[-len(y_test):].reset_index(drop=True),
+            "Actual": y_test,
+            "Predicted": y_pred
+        }).to_csv(pred_path, index=False)
+
+        results.append({
+            "Date": today,
+            "Model": name,
+            "MAE": round(mae, 3),
+            "R2": round(r2, 3),
+            "Model_Path": model_path,
+            "Predictions_Path": pred_path
+        })
+
+        print(f"💾 Saved {name} model → {model_path}")
+
+    # Update registry
+    registry_path = "outputs/results/model_registry.csv"
+    run_df = pd.DataFrame(results)
+    has_history = os.path.exists(registry_path) and os.path.getsize(registry_path) > 0
+    old = pd.read_csv(registry_path) if has_history else None
+
+    # Append-only log: write just this run's rows; the full registry is still returned
+    run_df.to_csv(registry_path, mode="a", header=not has_history, index=False)
+    registry_df = run_df if old is None else pd.concat([old, run_df], ignore_index=True)
+    print(f"\n📘 Updated model registry → {registry_path}")
+
+    print("\n🏁 Training complete for all models!")
+    return registry_df
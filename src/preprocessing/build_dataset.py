@@ -7,6 +7,9 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
 DATA_RAW = os.path.join(BASE_DIR, "data", "raw")
 DATA_PROCESSED = os.path.join(BASE_DIR, "data", "processed")
 
+# The Kalimati scrapers write one row per commodity with an mm/dd/YYYY date
+SCRAPED_DATE_FORMAT = "%m/%d/%Y"
+
 # Print paths for debugging
 print("BASE_DIR:", BASE_DIR)
 print("DATA_RAW:", DATA_RAW)
@@ -14,7 +17,7 @@ print("DATA_PROCESSED:", DATA_PROCESSED)
 
 # Import the required utility functions
 try:
-    from utils import clean_number, clean_commodity
+    from utils import clean_number_series, clean_commodity_series
 except ImportError:
     print("Error: 'utils' module not found. Ensure 'utils.py' is present in the correct location.")
     raise
@@ -31,9 +34,9 @@ def load_price_data():
     df = pd.read_csv(path, encoding="utf-8-sig")
     df = df[["Date", "कृषि उपज", "औसत"]].copy()
     df.rename(columns={"कृषि उपज": "commodity", "औसत": "Average_Price"}, inplace=True)
-    df["commodity"] = df["commodity"].apply(clean_commodity)
-    df["Average_Price"] = df["Average_Price"].apply(clean_number)
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df["commodity"] = clean_commodity_series(df["commodity"])
+    df["Average_Price"] = clean_number_series(df["Average_Price"])
+    df["Date"] = pd.to_datetime(df["Date"], format=SCRAPED_DATE_FORMAT, errors="coerce", cache=True)
     df = df[df["commodity"] == "Tomato_Big"].dropna(subset=["Date", "Average_Price"])
     df = df.groupby("Date", as_index=False)["Average_Price"].mean()
     return df.sort_values("Date")
@@ -51,9 +54,9 @@ def load_supply_data():
     df = pd.read_csv(path, encoding="utf-8-sig")
     df = df[["Date", "कृषि उपज", "आगमन"]].copy()
     df.rename(columns={"कृषि उपज": "commodity", "आगमन": "Supply_Volume"}, inplace=True)
-    df["commodity"] = df["commodity"].apply(clean_commodity)
-    df["Supply_Volume"] = df["Supply_Volume"].apply(clean_number)
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df["commodity"] = clean_commodity_series(df["commodity"])
+    df["Supply_Volume"] = clean_number_series(df["Supply_Volume"])
+    df["Date"] = pd.to_datetime(df["Date"], format=SCRAPED_DATE_FORMAT, errors="coerce", cache=True)
     tomato_df = df[df["commodity"].isin(["Tomato_Big", "Tomato_Small", "Tomato"])].copy()
     tomato_sum = tomato_df.groupby("Date")["Supply_Volume"].sum().reset_index()
     return tomato_sum.sort_values("Date")
@@ -90,10 +93,10 @@ def load_fuel_data():
     path = os.path.join(DATA_RAW, "fuel.csv")
     if not os.path.exists(path):
         return pd.DataFrame(columns=["Date", "Diesel"])
-    df = pd.read_csv(path)
+    df = pd.read_csv(path, usecols=[0, 1], parse_dates=[0])
     df.rename(columns={df.columns[0]: "Date", df.columns[1]: "Diesel"}, inplace=True)
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-    df["Diesel"] = pd.to_numeric(df["Diesel"], errors="coerce")
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")  # no-op once parsed by read_csv
+    df["Diesel"] = pd.to_numeric(df["Diesel"], errors="coerce")  # uploaded files may hold placeholders like "-"
     df = df.dropna(subset=["Date"]).drop_duplicates("Date").sort_values("Date")
     return df
 
@@ -103,8 +106,9 @@ def load_inflation_data():
     print(f"Checking if inflation data exists at {path}: {os.path.exists(path)}")  # Debugging
     if not os.path.exists(path):
         return pd.DataFrame(columns=["Date", "Inflation"])
-    df = pd.read_csv(path)
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df = pd.read_csv(path, usecols=["Date", "Inflation"], parse_dates=["Date"])
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")  # no-op once parsed by read_csv
+    df["Inflation"] = pd.to_numeric(df["Inflation"], errors="coerce")
     df = df.dropna(subset=["Date"]).drop_duplicates("Date").sort_values("Date")
     return df[["Date", "Inflation"]]
 
@@ -113,10 +117,10 @@ def load_exchange_data():
     path = os.path.join(DATA_RAW, "exchange.csv")
     if not os.path.exists(path):
         return pd.DataFrame(columns=["Date", "USD_TO_NPR"])
-    df = pd.read_csv(path)
+    df = pd.read_csv(path, usecols=[0, 1], parse_dates=[0])
     df.rename(columns={df.columns[0]: "Date", df.columns[1]: "USD_TO_NPR"}, inplace=True)
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-    df["USD_TO_NPR"] = pd.to_numeric(df["USD_TO_NPR"], errors="coerce")
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")  # no-op once parsed by read_csv
+    df["USD_TO_NPR"] = pd.to_numeric(df["USD_TO_NPR"], errors="coerce")  # uploaded files may hold placeholders like "-"
     df = df.dropna(subset=["Date"]).drop_duplicates("Date").sort_values("Date")
     return df
 
@@ -125,11 +129,9 @@ def load_exchange_data():
 # 🔗 Merge All + Handle Missing External Data
 # =========================================================
 def merge_all(price_df, supply_df, weather_df, fuel_df, inflation_df, exchange_df):
-    df = pd.merge(price_df, supply_df, on="Date", how="left")
-    df = pd.merge(df, exchange_df, on="Date", how="left")
-    df = pd.merge(df, fuel_df, on="Date", how="left")
-    df = pd.merge(df, inflation_df, on="Date", how="left")
-    df = pd.merge(df, weather_df, on="Date", how="left")
+    # Align everything on a shared Date index and left-join in a single pass
+    others = [supply_df, exchange_df, fuel_df, inflation_df, weather_df]
+    df = price_df.set_index("Date").join([o.set_index("Date") for o in others], how="left").reset_index()
 
     # ⚙️ Forward-fill macroeconomic indicators to match latest available data
     macro_cols = ["USD_TO_NPR", "Diesel", "Inflation"]
@@ -175,18 +177,37 @@ def add_seasons(df):
 
 
 def add_festival_and_fiscal(df):
-    df["is_festival"] = 0
-    for i, row in df.iterrows():
-        m, d = row["month"], row["day"]
-        if m == 3 and (1 <= d <= 20): df.at[i, "is_festival"] = 1
-        elif m == 4 and (10 <= d <= 20): df.at[i, "is_festival"] = 1
-        elif (m == 9 and d >= 25) or (m == 10 and d <= 15): df.at[i, "is_festival"] = 1
-        elif m == 11 and (1 <= d <= 15): df.at[i, "is_festival"] = 1
-
-    def get_fy(date):
-        return f"FY_{date.year if date.month >= 7 else date.year - 1}_{str((date.year if date.month >= 7 else date.year - 1) + 1)[-2:]}"
-    
-    df["Fiscal_Year"] = df["Date"].apply(get_fy)
+    m, d = df["month"], df["day"]
+    holi = (m == 3) & d.between(1, 20)
+    new_year = (m == 4) & d.between(10, 20)
+    dashain = ((m == 9) & (d >= 25)) | ((m == 10) & (d <= 15))
+    tihar = (m == 11) & d.between(1, 15)
+    df["is_festival"] = (holi | new_year | dashain | tihar).astype("int8")
+
+    # Nepal's fiscal year starts in July (FY_2021_22 covers Jul 2021 → Jun 2022)
+    year = df["Date"].dt.year.to_numpy()
+    month = df["Date"].dt.month.to_numpy()
+    fy_start = np.where(month >= 7, year, year - 1)
+    fy_end = np.char.zfill(((fy_start + 1) % 100).astype(str), 2)
+    df["Fiscal_Year"] = np.char.add(np.char.add("FY_", fy_start.astype(str)), np.char.add("_", fy_end))
+    return df
+
+
+# =========================================================
+# 🗜️ Compact Numeric Dtypes
+# =========================================================
+INT8_COLS = [
+    "day", "month", "day_of_week", "is_weekend", "is_festival",
+    "Season_Winter", "Season_Spring", "Season_Monsoon", "Season_Autumn",
+]
+
+
+def downcast_numeric(df):
+    """Store small-range calendar flags as int8 and measurements as float32."""
+    int8_cols = [c for c in INT8_COLS if c in df.columns]
+    df[int8_cols] = df[int8_cols].astype("int8")
+    float_cols = df.select_dtypes("float64").columns
+    df[float_cols] = df[float_cols].astype("float32")
     return df
 
 
@@ -207,12 +228,21 @@ def build_dataset():
     final_df = add_time_features(final_df)
     final_df = add_seasons(final_df)
     final_df = add_festival_and_fiscal(final_df)
+    final_df = downcast_numeric(final_df)
 
     os.makedirs(DATA_PROCESSED, exist_ok=True)
     output_path = os.path.join(DATA_PROCESSED, "tomato_clean_data.csv")
     final_df.to_csv(output_path, index=False, encoding="utf-8-sig")
-
     print(f"✅ Final dataset saved → {output_path}")
+
+    # Columnar copy: smaller, keeps dtypes, and lets readers prune columns
+    parquet_path = os.path.join(DATA_PROCESSED, "tomato_clean_data.parquet")
+    try:
+        final_df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", index=False)
+        print(f"✅ Parquet copy saved → {parquet_path}")
+    except ImportError:
+        print("⚠️ pyarrow not installed — skipping Parquet output.")
+
     print(f"📈 Total Rows: {len(final_df)}, Columns: {len(final_df.columns)}")
     return final_df
 
@@ -5,15 +5,28 @@ Adds lag and rolling window features to the processed Kalimati tomato dataset.
 """
 
 import os
+import numpy as np
 import pandas as pd
 
+# Optional (ensure numba installed for the compiled lag/rolling kernel)
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 
 # ============================================================
 # 📥 Load Processed Dataset
 # ============================================================
 def load_data(path="data/processed/tomato_clean_data.csv"):
-    """Load the processed dataset created by build_dataset.py."""
-    df = pd.read_csv(path, encoding="utf-8-sig")
+    """Load the processed dataset created by build_dataset.py (Parquet copy preferred)."""
+    parquet_path = os.path.splitext(path)[0] + ".parquet"
+    if os.path.exists(parquet_path) and (
+        not os.path.exists(path) or os.path.getmtime(parquet_path) >= os.path.getmtime(path)
+    ):
+        df = pd.read_parquet(parquet_path)
+    else:
+        df = pd.read_csv(path, encoding="utf-8-sig")
     df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
     df = df.dropna(subset=["Date"]).sort_values("Date").reset_index(drop=True)
     return df
@@ -22,17 +35,64 @@ def load_data(path="data/processed/tomato_clean_data.csv"):
 # ============================================================
 # 🕒 Add Lag and Rolling Features
 # ============================================================
+def _lag_roll_kernel(x, lags, windows, out):
+    """Fill `out` with lags of `x`, then trailing window means (NaN until the window is full)."""
+    n = x.shape[0]
+    k = 0
+    for lag in lags:
+        for i in range(n):
+            out[i, k] = x[i - lag] if i >= lag else np.nan
+        k += 1
+    # Running sum gives O(n) per window; NaNs are counted so they blank the window like pandas
+    for w in windows:
+        total = 0.0
+        nan_count = 0
+        for i in range(n):
+            if np.isnan(x[i]):
+                nan_count += 1
+            else:
+                total += x[i]
+            if i >= w:
+                if np.isnan(x[i - w]):
+                    nan_count -= 1
+                else:
+                    total -= x[i - w]
+            out[i, k] = total / w if (i >= w - 1 and nan_count == 0) else np.nan
+        k += 1
+
+
+# No fastmath: it would let the compiler assume NaNs never occur
+_lag_roll_kernel = njit(cache=True)(_lag_roll_kernel) if njit else None
+
+
+def lag_and_rolling_columns(df, col, lags, windows, new_cols):
+    """Compute lag and rolling window columns for `col` into the `new_cols` dict."""
+    if col not in df.columns:
+        print(f"⚠️ Warning: Column '{col}' not found in dataset. Skipping.")
+        return
+    series = df[col]
+    # Keep the source precision (float32 from the Parquet copy) on both paths
+    dtype = series.dtype if series.dtype.kind == "f" else np.dtype(np.float64)
+    names = [f"{col}_lag{lag}" for lag in lags] + [f"{col}_roll{window}" for window in windows]
+    if _lag_roll_kernel is not None:
+        out = np.empty((len(df), len(names)), dtype=dtype)
+        x = np.ascontiguousarray(series.to_numpy(dtype=dtype))
+        _lag_roll_kernel(x, np.asarray(lags, dtype=np.int64), np.asarray(windows, dtype=np.int64), out)
+        new_cols.update(zip(names, out.T))
+    else:
+        for lag in lags:
+            new_cols[f"{col}_lag{lag}"] = series.shift(lag).astype(dtype)
+        for window in windows:
+            new_cols[f"{col}_roll{window}"] = series.rolling(window).mean().astype(dtype)
+
+
 def add_lag_and_rolling_features(df, columns, lags, windows):
     """Add lag and rolling window features for given columns."""
+    new_cols = {}
     for col in columns:
-        if col not in df.columns:
-            print(f"⚠️ Warning: Column '{col}' not found in dataset. Skipping.")
-            continue
-        for lag in lags:
-            df[f"{col}_lag{lag}"] = df[col].shift(lag)
-        for window in windows:
-            df[f"{col}_roll{window}"] = df[col].rolling(window).mean()
-    return df
+        lag_and_rolling_columns(df, col, lags, windows, new_cols)
+    # One concat instead of a block-manager insert per new column
+    return pd.concat([df, pd.DataFrame(new_cols, index=df.index)], axis=1)
 
 
 # ============================================================
@@ -53,8 +113,11 @@ TEMPORAL_FEATURES = {
 # ============================================================
 def generate_temporal_features(df, temporal_config):
     """Generate lag and rolling features for all configured columns."""
+    # Collect every feature's columns first, then concat once for the whole config
+    new_cols = {}
     for feat, params in temporal_config.items():
-        df = add_lag_and_rolling_features(df, [feat], params["lags"], params["rolls"])
+        lag_and_rolling_columns(df, feat, params["lags"], params["rolls"], new_cols)
+    df = pd.concat([df, pd.DataFrame(new_cols, index=df.index)], axis=1)
     df = df.dropna().reset_index(drop=True)
     return df
 
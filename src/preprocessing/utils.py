@@ -5,8 +5,15 @@ General-purpose helper functions for data cleaning and transformation.
 """
 
 import pandas as pd
+import numpy as np
 import re
 
+# Nepali → English digit table, built once at import time
+_NE_DIGITS = str.maketrans("०१२३४५६७८९", "0123456789")
+
+# Parenthesised origin tags, e.g. "गोलभेडा ठूलो(नेपाली)"
+_PAREN_RE = re.compile(r"\(.*?\)")
+
 
 # ============================================================
 # 🧩 Convert Nepali digits to English
@@ -15,8 +22,7 @@ def nepali_to_english(num_str):
     """Convert Nepali digits (०१२३४५६७८९) to English (0123456789)."""
     if pd.isna(num_str):
         return num_str
-    mapping = str.maketrans("०१२३४५६७८९", "0123456789")
-    return str(num_str).translate(mapping)
+    return str(num_str).translate(_NE_DIGITS)
 
 
 # ============================================================
@@ -39,13 +45,41 @@ def clean_number(value):
 # ============================================================
 def clean_commodity(name):
     """Normalize Nepali commodity names into standard English categories."""
-    name = re.sub(r"\(.*?\)", "", str(name)).strip()
-    mapping = {
-        "गोलभेडा ठूलो": "Tomato_Big",
-        "गोलभेडा सानो": "Tomato_Small",
-        "गोलभेडा": "Tomato"
-    }
-    for np_name, en_name in mapping.items():
-        if np_name in name:
-            return en_name
+    name = _PAREN_RE.sub("", str(name)).strip()
+    # Order matters: the generic "गोलभेडा" must be checked after the graded names
+    if "गोलभेडा ठूलो" in name:
+        return "Tomato_Big"
+    if "गोलभेडा सानो" in name:
+        return "Tomato_Small"
+    if "गोलभेडा" in name:
+        return "Tomato"
     return name
+
+
+# ============================================================
+# 🧩 Vectorized versions (whole-column cleaning)
+# ============================================================
+def clean_number_series(series):
+    """Vectorized clean_number: strip currency/commas, map Nepali digits, cast to float."""
+    cleaned = (
+        series.astype(str)
+        .str.replace("रू", "", regex=False)
+        .str.replace(",", "", regex=False)
+        .str.strip()
+        .str.translate(_NE_DIGITS)
+    )
+    return pd.to_numeric(cleaned, errors="coerce")
+
+
+def clean_commodity_series(series):
+    """Vectorized clean_commodity: drop parenthesised origin tags and map tomato grades."""
+    name = series.astype(str).str.replace(_PAREN_RE, "", regex=True).str.strip()
+    conditions = [
+        name.str.contains("गोलभेडा ठूलो", regex=False),
+        name.str.contains("गोलभेडा सानो", regex=False),
+        name.str.contains("गोलभेडा", regex=False),
+    ]
+    return pd.Series(
+        np.select(conditions, ["Tomato_Big", "Tomato_Small", "Tomato"], default=name),
+        index=series.index,
+    )
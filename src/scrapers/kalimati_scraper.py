@@ -0,0 +1,380 @@
+# =========================================================
+# 🥬 Kalimati Market Scraper (shared by price & arrival scripts)
+# =========================================================
+# Output CSVs are append-only and written in ascending date order (run() only
+# scrapes dates after the last recorded one, and parallel chunks are merged in
+# order), so the newest date is always in the file's last data row.
+import csv
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import JavascriptException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+# Optional (ensure lxml installed to parse the table in C instead of in the browser)
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# ---------------------------------------------------------
+# 🌐 Scrape targets
+# ---------------------------------------------------------
+# kind: label used in log messages; button_xpath: the form's submit button
+Target = namedtuple("Target", "kind url out_file button_xpath")
+
+START_DATE_STR = "01/01/2022"
+
+# Parallel Chrome sessions used when backfilling many days (one per contiguous date chunk)
+SCRAPE_WORKERS = int(os.environ.get("SCRAPE_WORKERS", "4"))
+WORKER_STAGGER = 0.1  # seconds between driver launches so workers don't hit the site at once
+DRIVER_RECYCLE_EVERY = 200  # dates per browser session before restarting Chrome to shed memory
+FLUSH_EVERY = 10  # dates buffered before writing to disk (an interrupted batch is re-scraped on resume)
+
+# Page signals used instead of fixed sleeps
+DATE_INPUT_CSS = "input[type='date'], input[type='text']"
+TABLE_TEXT_JS = "const t = document.querySelector('table'); return t ? t.innerText : null;"
+RENDER_TIMEOUT = 10  # seconds to wait for the table to change after submitting a date
+BUTTON_WARM_TIMEOUT = 10  # seconds, once the button has been seen on an earlier date
+NO_DATA_TEXT = "टेबलमा डाटा उपलब्ध भएन"
+
+# Per-URL flag set after the first successful click (shared by parallel drivers)
+_button_seen = {}
+
+# ---------------------------------------------------------
+# 🕒 Date utilities (timezone-safe for GitHub Actions)
+# ---------------------------------------------------------
+NPT = timezone(timedelta(hours=5, minutes=45))  # Nepal Time, no DST
+
+def today_nepal_date():
+    """Return today's date in Nepal Time (naive datetime for safe comparisons)."""
+    return datetime.now(NPT).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+
+def date_str(dt):
+    return dt.strftime("%m/%d/%Y")
+
+def parse_date(s):
+    try:
+        return datetime.strptime(s, "%m/%d/%Y")
+    except Exception:
+        return None
+
+# ---------------------------------------------------------
+# 📁 CSV helpers
+# ---------------------------------------------------------
+def latest_date_in_csv(path, tail_bytes=8192):
+    """Return the latest date in the CSV file (if exists).
+
+    Rows are appended in date order, so only the last few KB are read.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(size - tail_bytes, 0))
+        chunk = f.read()
+
+    lines = chunk.split(b"\n")
+    if len(chunk) < size:
+        lines = lines[1:]  # first fragment may start mid-line
+    for line in reversed(lines):
+        d = parse_date(line.split(b",", 1)[0].decode("utf-8", errors="ignore").strip())
+        if d:
+            return d
+
+    # No complete dated row in the tail (e.g. a hand-edited file): fall back to a full scan
+    if len(chunk) < size:
+        return _scan_latest_date(path)
+    return None
+
+def _scan_latest_date(path):
+    """Return the latest date anywhere in the CSV (slow path, reads every row)."""
+    with open(path, encoding="utf-8") as f:
+        next(f, None)  # skip header
+        dates = [parse_date(row.split(",")[0]) for row in f if row.strip()]
+    return max((d for d in dates if d), default=None)
+
+def merge_parts(part_files, out_file):
+    """Append per-worker CSVs to out_file in date order, keeping a single header."""
+    with open(out_file, "a", newline="", encoding="utf-8") as out:
+        for part in part_files:
+            if not os.path.exists(part):
+                continue
+            with open(part, newline="", encoding="utf-8") as f:
+                header = f.readline()
+                if out.tell() == 0:
+                    out.write(header)
+                out.writelines(f)
+            os.remove(part)
+
+# ---------------------------------------------------------
+# 🧭 Selenium setup
+# ---------------------------------------------------------
+def setup_driver():
+    """Initialize headless Chrome (optimized for GitHub Actions)."""
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--log-level=3")
+
+    # Only the table text is read: skip images, GPU compositing, extensions and notifications
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-extensions")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    return webdriver.Chrome(options=options)
+
+# ---------------------------------------------------------
+# ⏰ Set the date on the Kalimati website
+# ---------------------------------------------------------
+def set_date(driver, wait, date_str):
+    """Try to set the target date in the date input field."""
+    try:
+        # Wait for and select the first usable input in the same query
+        inputs = wait.until(lambda d: [
+            el for el in d.find_elements(By.CSS_SELECTOR, DATE_INPUT_CSS)
+            if el.is_displayed() and el.is_enabled()
+        ] or False)
+        driver.execute_script("""
+            el = arguments[0];
+            el.value = arguments[1];
+            if ('valueAsDate' in el) {
+                el.valueAsDate = new Date(arguments[1]);
+            }
+            el.dispatchEvent(new Event('input', { bubbles: true }));
+            el.dispatchEvent(new Event('change', { bubbles: true }));
+        """, inputs[0], date_str)
+        return True
+    except TimeoutException:
+        pass
+    except Exception as e:
+        print(f"[WARN] Error setting date: {e}")
+    return False
+
+# ---------------------------------------------------------
+# 📋 Extract the rendered table (header + cell text per row)
+# ---------------------------------------------------------
+TABLE_JS = """
+    return Array.from(document.querySelectorAll('table tr')).map(r => ({
+        ths: Array.from(r.querySelectorAll('th')).map(e => e.innerText.trim()),
+        tds: Array.from(r.querySelectorAll('td')).map(e => e.innerText.trim())
+    }));
+"""
+
+if etree is not None:
+    ROWS_XPATH = etree.XPath("//table//tr")
+    TH_XPATH = etree.XPath(".//th")
+    TD_XPATH = etree.XPath(".//td")
+
+def extract_table(driver, page_source):
+    """Return [{"ths": [...], "tds": [...]}, ...] for every table row on the page."""
+    if etree is None:
+        return driver.execute_script(TABLE_JS)
+    # Reuse the page source already fetched for the "no data" check: no extra browser round trip
+    tree = lxml.html.fromstring(page_source)
+    return [
+        {
+            "ths": [c.text_content().strip() for c in TH_XPATH(tr)],
+            "tds": [c.text_content().strip() for c in TD_XPATH(tr)],
+        }
+        for tr in ROWS_XPATH(tree)
+    ]
+
+# ---------------------------------------------------------
+# 📊 Scrape data for a specific date
+# ---------------------------------------------------------
+def scrape_date(driver, wait, target, date_str):
+    """Submit one date on the target page; return (header, lazy rows prefixed with the date)."""
+    print(f"📅 Scraping {target.kind} data for {date_str} ...")
+    driver.get(target.url)
+
+    if not set_date(driver, wait, date_str):
+        print(f"[WARN] Could not set date {date_str}")
+        return [], []
+    before = driver.execute_script(TABLE_TEXT_JS)
+
+    button_seen = _button_seen.setdefault(target.url, threading.Event())
+    try:
+        # Once the button has been found, a miss means the page is broken; don't wait the full timeout
+        button_wait = WebDriverWait(driver, BUTTON_WARM_TIMEOUT) if button_seen.is_set() else wait
+        btn = button_wait.until(EC.element_to_be_clickable((By.XPATH, target.button_xpath)))
+        driver.execute_script("arguments[0].click();", btn)
+        button_seen.set()
+    except Exception:
+        print(f"[WARN] Could not click {target.kind} button for {date_str}")
+        return [], []
+
+    # Wait for data table to appear
+    try:
+        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table")))
+    except:
+        print(f"[WARN] Table not found for {date_str}")
+        return [], []
+
+    # Wait until the table re-renders for this date rather than sleeping a fixed time;
+    # identical content (e.g. the page's default date) just falls through after the timeout
+    try:
+        WebDriverWait(driver, RENDER_TIMEOUT, ignored_exceptions=(JavascriptException,)).until(
+            lambda d: (d.execute_script(TABLE_TEXT_JS) or before) != before
+        )
+    except TimeoutException:
+        pass
+
+    # Check for “no data” message
+    page_source = driver.page_source
+    if NO_DATA_TEXT in page_source:
+        print(f"🚫 No {target.kind} data for {date_str}")
+        return [], []
+
+    # Read the whole table at once instead of one browser call per cell
+    table = extract_table(driver, page_source)
+    header = next((r["ths"] for r in table if r["ths"]), [])
+    # Rows are produced as the caller writes them; blank rows are skipped
+    return header, ([date_str, *r["tds"]] for r in table if any(r["tds"]))
+
+# ---------------------------------------------------------
+# ⚡ Backfill a date range (optionally across parallel drivers)
+# ---------------------------------------------------------
+def chunk_ranges(start, end, n):
+    """Split [start, end] into at most n contiguous (first, last) day ranges."""
+    days = (end - start).days + 1
+    size = -(-days // n)
+    return [
+        (start + timedelta(days=i), min(start + timedelta(days=i + size - 1), end))
+        for i in range(0, days, size)
+    ]
+
+def scrape_days(target, start, end, out_file=None):
+    """Scrape every day in [start, end] sequentially; return (rows added, finished cleanly)."""
+    out_file = out_file or target.out_file
+    os.makedirs(os.path.dirname(out_file) or ".", exist_ok=True)
+    driver = None
+    total = 0
+
+    # One handle and writer for the whole range instead of an open/close per date
+    out = open(out_file, "a", newline="", encoding="utf-8", buffering=1 << 20)
+    w = csv.writer(out)
+    need_header = out.tell() == 0
+    try:
+        # Inside the try: a Chrome that fails to launch ends this range like any other error
+        driver = setup_driver()
+        wait = WebDriverWait(driver, 25)
+        scraped = 0
+        while start <= end:
+            # Long backfills: restart the browser periodically instead of letting it bloat
+            if scraped and scraped % DRIVER_RECYCLE_EVERY == 0:
+                driver.quit()
+                driver = None
+                driver = setup_driver()
+                wait = WebDriverWait(driver, 25)
+            ds = date_str(start)
+            header, rows = scrape_date(driver, wait, target, ds)
+            rows = iter(rows)
+            first = next(rows, None)
+            if first is not None:
+                if need_header:
+                    w.writerow(["Date"] + header)
+                    need_header = False
+                w.writerow(first)
+                # Write straight from the table rows; count them in the same pass
+                added = 1 + sum(1 for _ in map(w.writerow, rows))
+                total += added
+                print(f"✅ Added {added} {target.kind} rows for {ds}")
+            elif header:
+                print(f"[WARN] {target.kind} table for {ds} has no data rows")
+            start += timedelta(days=1)
+            scraped += 1
+
+            # Flush whole dates only: a batch never fills the 1 MiB buffer, so rows are never split
+            if scraped % FLUSH_EVERY == 0:
+                out.flush()
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return total, False
+    finally:
+        out.close()
+        if driver is not None:
+            driver.quit()
+    return total, True
+
+def scrape_range_parallel(target, start, end, workers):
+    """Scrape contiguous date chunks concurrently, each driver writing its own part file."""
+    chunks = chunk_ranges(start, end, workers)
+    part_files = [f"{target.out_file}.part{i}" for i in range(len(chunks))]
+    for part in part_files:
+        if os.path.exists(part):
+            os.remove(part)
+
+    # Each thread owns its own driver, so nothing Selenium-side is shared between workers
+    def worker(i):
+        time.sleep(i * WORKER_STAGGER)
+        (first, last), part = chunks[i], part_files[i]
+        try:
+            return scrape_days(target, first, last, part)
+        except Exception as e:
+            # Report as a failed chunk so the chunks before it are still merged
+            print(f"❌ Worker for {date_str(first)} failed: {e}")
+            return 0, False
+
+    with ThreadPoolExecutor(max_workers=len(chunks)) as ex:
+        results = list(ex.map(worker, range(len(chunks))))
+
+    # Resume relies on the last recorded date, so never keep chunks after one that stopped early
+    keep = len(chunks)
+    for i, (_, ok) in enumerate(results):
+        if not ok:
+            keep = i + 1
+            print(f"⚠️ Chunk starting {date_str(chunks[i][0])} stopped early — discarding later chunks.")
+            break
+    merge_parts(part_files[:keep], target.out_file)
+    for part in part_files[keep:]:
+        if os.path.exists(part):
+            os.remove(part)
+    return sum(added for added, _ in results[:keep])
+
+# ---------------------------------------------------------
+# 🚀 Resume from the last recorded date up to today
+# ---------------------------------------------------------
+def run(target):
+    # Base date (start of dataset)
+    start = parse_date(START_DATE_STR)
+
+    # Today's date (Nepal)
+    end = today_nepal_date()
+
+    # Find last recorded date in CSV (if any)
+    last_date = latest_date_in_csv(target.out_file)
+
+    # Resume logic
+    if last_date:
+        if last_date >= end:
+            print(f"🟢 Data already up-to-date. Last entry: {date_str(last_date)}")
+            return 0
+        print(f"⏩ Resuming from {date_str(last_date)}")
+        start = last_date + timedelta(days=1)
+    else:
+        print("📄 No previous data found. Starting fresh.")
+
+    # Start scraping
+    workers = min(SCRAPE_WORKERS, (end - start).days + 1)
+    if workers > 1:
+        print(f"⚡ Backfilling {(end - start).days + 1} days with {workers} parallel drivers")
+        total = scrape_range_parallel(target, start, end, workers)
+    else:
+        total, _ = scrape_days(target, start, end)
+
+    print(f"🏁 Done! Total new {target.kind} rows: {total}")
+    return total
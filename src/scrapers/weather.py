@@ -1,12 +1,28 @@
 import requests
 import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 
+# Optional: persistent HTTP cache so re-runs don't re-download archived days
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
 ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
 FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
 OUT_DIR = "data/raw"
 OUT_FILE = os.path.join(OUT_DIR, "weather.csv")
+CACHE_DIR = os.path.join(".cache", "open-meteo")
+
+# Connect/read timeouts for one Open-Meteo request
+REQUEST_TIMEOUT = (5, 15)
+
+# The archive lags real time by a few days; recent responses may still be revised
+ARCHIVE_SETTLED_DAYS = 7
 
 # 🌍 District coordinates
 DISTRICTS = {
@@ -23,12 +39,26 @@ DAILY_VARS = (
     "wind_speed_10m_max,precipitation_sum"
 )
 
+if requests_cache:
+    # One file per response; archived days never change, so keep them forever
+    SESSION = requests_cache.CachedSession(
+        CACHE_DIR, backend="filesystem", expire_after=-1, stale_if_error=True
+    )
+else:
+    SESSION = requests.Session()
+
+# Reuse pooled connections and retry transient rate-limit/server errors
+SESSION.mount("https://", HTTPAdapter(max_retries=Retry(
+    total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]
+)))
+
+NPT = timezone(timedelta(hours=5, minutes=45))  # Nepal Time, no DST
+
 def today_nepal_date():
-    now_utc = datetime.now(timezone.utc)
-    return (now_utc + timedelta(hours=5, minutes=45)).date()
+    return datetime.now(NPT).date()
 
-def fetch_weather(lat, lon, start_date, end_date):
-    """Fetch daily historical data for one district"""
+def _request_daily(lat, lon, start_date, end_date, cache):
+    """Request one date range from the archive; return its 'daily' block (or None)."""
     params = {
         "latitude": lat,
         "longitude": lon,
@@ -37,16 +67,39 @@ def fetch_weather(lat, lon, start_date, end_date):
         "end_date": end_date.isoformat(),
         "timezone": "Asia/Kathmandu"
     }
-    r = requests.get(ARCHIVE_URL, params=params)
+    kwargs = {}
+    if requests_cache and not cache:
+        kwargs["expire_after"] = requests_cache.DO_NOT_CACHE
+    r = SESSION.get(ARCHIVE_URL, params=params, timeout=REQUEST_TIMEOUT, **kwargs)
     r.raise_for_status()
-    data = r.json()
+    return r.json().get("daily")
 
-    if "daily" not in data:
+def fetch_weather(lat, lon, start_date, end_date):
+    """Fetch daily historical data for one district"""
+    # Settled history is requested in whole calendar months so the cached URLs repeat across
+    # runs; the still-revisable remainder is fetched fresh in one request
+    settled_end = today_nepal_date() - timedelta(days=ARCHIVE_SETTLED_DAYS)
+    blocks = []
+    month = start_date.replace(day=1)
+    while month <= end_date:
+        month_end = (month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        if month_end > settled_end:
+            break
+        blocks.append(_request_daily(lat, lon, month, month_end, cache=True))
+        month = month_end + timedelta(days=1)
+    recent_start = max(start_date, month)
+    if recent_start <= end_date:
+        blocks.append(_request_daily(lat, lon, recent_start, end_date, cache=False))
+    blocks = [pd.DataFrame(b) for b in blocks if b]
+
+    if not blocks:
         print(f"⚠️ No 'daily' data for lat={lat}, lon={lon}")
         return pd.DataFrame(columns=["date"])
 
-    df = pd.DataFrame(data["daily"])
+    df = pd.concat(blocks, ignore_index=True)
     df["date"] = pd.to_datetime(df["time"])
+    # Month blocks can reach outside the requested range
+    df = df[df["date"].between(pd.Timestamp(start_date), pd.Timestamp(end_date))].reset_index(drop=True)
     # Compute daily average temperature & air pressure
     df["Temperature"] = df[["temperature_2m_max", "temperature_2m_min"]].mean(axis=1)
     df["Air_Pressure"] = df[["surface_pressure_max", "surface_pressure_min"]].mean(axis=1)
@@ -60,20 +113,25 @@ def fetch_weather(lat, lon, start_date, end_date):
 
     return df[["date", "Temperature", "Air_Pressure", "Wind_Speed", "Precipitation", "Rainfall_MM"]]
 
+def fetch_district(name, coords, start_date, end_date):
+    """Fetch one district and prefix its columns with the district name"""
+    print(f"🌦️ Fetching {name} weather...")
+    df = fetch_weather(coords["lat"], coords["lon"], start_date, end_date)
+    df = df.add_prefix(f"{name}_")
+    df.rename(columns={f"{name}_date": "date"}, inplace=True)
+    return df
+
 def merge_districts(start_date, end_date):
     """Fetch and merge weather for all districts"""
-    frames = []
-    for name, coords in DISTRICTS.items():
-        print(f"🌦️ Fetching {name} weather...")
-        df = fetch_weather(coords["lat"], coords["lon"], start_date, end_date)
-        df = df.add_prefix(f"{name}_")
-        df.rename(columns={f"{name}_date": "date"}, inplace=True)
-        frames.append(df)
-
-    # Merge all districts by 'date'
-    df_final = frames[0]
-    for df in frames[1:]:
-        df_final = pd.merge(df_final, df, on="date", how="outer")
+    # One request per district; overlap the network round trips
+    with ThreadPoolExecutor(max_workers=len(DISTRICTS)) as ex:
+        frames = list(ex.map(
+            lambda item: fetch_district(item[0], item[1], start_date, end_date),
+            DISTRICTS.items(),
+        ))
+
+    # All districts share the same date range, so align on the index in one outer concat
+    df_final = pd.concat([df.set_index("date") for df in frames], axis=1).rename_axis("date").reset_index()
 
     return df_final.sort_values("date")
 
@@ -83,13 +141,19 @@ if __name__ == "__main__":
     yesterday = today - timedelta(days=1)
 
     if os.path.exists(OUT_FILE) and os.path.getsize(OUT_FILE) > 0:
-        old = pd.read_csv(OUT_FILE)
-        old["date"] = pd.to_datetime(old["date"], errors="coerce")
-        last_date = old["date"].max().date()
+        # Only the date column is needed to find where to resume
+        raw_dates = pd.read_csv(OUT_FILE, usecols=["date"])["date"]
+        existing = pd.to_datetime(raw_dates, errors="coerce")
+        last_date = existing.max().date()
         print(f"📅 Last recorded date: {last_date}")
+        columns = pd.read_csv(OUT_FILE, nrows=0).columns
+        # Appending ISO rows is only safe if the file is already ISO; otherwise rewrite it once
+        appendable = pd.to_datetime(raw_dates, format="%Y-%m-%d", errors="coerce").notna().all()
     else:
-        old = pd.DataFrame()
+        existing = pd.Series(dtype="datetime64[ns]")
         last_date = datetime.strptime("2021-12-31", "%Y-%m-%d").date()
+        columns = None
+        appendable = True
 
     # If already up-to-date, skip
     if last_date >= yesterday:
@@ -100,11 +164,19 @@ if __name__ == "__main__":
     end_date = yesterday
 
     df_new = merge_districts(start_date, end_date)
+    df_new = df_new[~df_new["date"].isin(existing)]
 
     # Merge with old dataset
-    if not df_new.empty:
+    if df_new.empty:
+        print("⚠️ No new data to add.")
+    elif appendable:
+        if columns is not None:
+            df_new = df_new.reindex(columns=columns)
+        df_new.to_csv(OUT_FILE, mode="a", header=columns is None, index=False)
+        print(f"✅ Multi-district weather updated → {OUT_FILE}")
+    else:
+        old = pd.read_csv(OUT_FILE)
+        old["date"] = pd.to_datetime(old["date"], errors="coerce")
         df = pd.concat([old, df_new]).drop_duplicates(subset=["date"]).sort_values("date")
         df.to_csv(OUT_FILE, index=False)
         print(f"✅ Multi-district weather updated → {OUT_FILE}")
-    else:
-        print("⚠️ No new data to add.")
@@ -0,0 +1,43 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "modeling"))
+from predict_next_days import add_lag_and_rolling_features, forecast_next_days  # noqa: E402
+
+LAG_FEATURES = ["Average_Price", "Supply_Volume"]
+
+
+def _history(n_days):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Date": pd.date_range("2025-01-01", periods=n_days, freq="D"),
+        "Average_Price": 50 + rng.normal(0, 2, n_days).cumsum(),
+        "Supply_Volume": rng.uniform(100, 200, n_days),
+    })
+
+
+def _model(df):
+    feats = add_lag_and_rolling_features(df, LAG_FEATURES).dropna()
+    X = feats.drop(columns=["Date", "Average_Price"])
+    return LinearRegression().fit(X, feats["Average_Price"])
+
+
+def test_short_history_forecasts_from_raw_window():
+    # 45 days leaves only 14 complete rows after dropna, fewer than the 30-day window
+    df = _history(45)
+    out = forecast_next_days(df, _model(_history(120)), LAG_FEATURES)
+
+    assert len(out) == 8
+    assert out["Predicted_Price"].notna().all()
+    assert out["Date"].iloc[0] == df["Date"].iloc[-1] + pd.Timedelta(days=1)
+
+
+def test_history_shorter_than_window_raises():
+    df = _history(20)
+    with pytest.raises(ValueError, match="at least 30 days"):
+        forecast_next_days(df, _model(_history(120)), LAG_FEATURES)